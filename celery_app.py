@@ -24,6 +24,7 @@ celery_app.conf.update(
     task_serializer='json',
     accept_content=['json'],
     result_serializer='json',
+    result_compression='gzip',  # Extraction results are large, highly compressible text
     timezone='UTC',
     enable_utc=True,
     
@@ -35,7 +36,8 @@ celery_app.conf.update(
     },
     
     # Worker settings
-    worker_prefetch_multiplier=1,
+    # Extraction is I/O-bound (HTTP to WordPress), so prefetch a few tasks per process
+    worker_prefetch_multiplier=int(os.environ.get('CELERY_PREFETCH', 4)),
     task_acks_late=True,
     worker_max_tasks_per_child=50,
     
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Date utilities for WordPress content extraction.
+
+This module provides the date parsing and formatting shared by the API
+endpoints and the Celery tasks.
+"""
+
+import re
+import functools
+from datetime import date, datetime
+
+
+# ISO 8601 date, optionally followed by a time (T or space separated, one or two digit
+# hour) with seconds, fractional seconds and UTC offset. [0-9] rather than \d, which
+# would also match non-ASCII digits
+_AFTER_DATE_RE = re.compile(
+    r'([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})'
+    r'(?:[T ](?:[01]?[0-9]|2[0-3]):[0-5][0-9](?::[0-5][0-9](?:\.[0-9]+)?)?(?:Z|[+-][0-9]{2}:?[0-9]{2})?)?'
+)
+
+
+@functools.lru_cache(maxsize=512)
+def parse_after_date(after_date_str):
+    """Normalize an 'afterDate' value to the YYYY-MM-DDT00:00:00 format used by the WordPress API.
+
+    Accepts YYYY-MM-DD, YYYY-MM-DD[T ]H[H]:MM[:SS[.fff]] and ISO 8601 with a UTC offset
+    (e.g. 2025-04-26T21:32:52.043Z). Only the date part is kept.
+
+    Raises:
+        ValueError: If the value is not one of the accepted formats or not a valid date
+    """
+    match = _AFTER_DATE_RE.fullmatch(after_date_str)
+    if not match:
+        raise ValueError("Invalid date format")
+
+    # Building the date validates it (e.g. rejects 2025-02-30)
+    after = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    return f"{after.isoformat()}T00:00:00"
+
+
+@functools.lru_cache(maxsize=1024)
+def format_post_date(date_str):
+    """Format a WordPress post date as YYYY-MM-DDTHH:MM:SS
+
+    WordPress 'date' values already start with that shape, so they are sliced;
+    anything else is parsed. Cached, since bulk exports repeat dates a lot.
+    """
+    if len(date_str) >= 19 and date_str[10] == 'T':
+        formatted = date_str[:19]
+        # Check the fixed-format assumption (stripped by python -O)
+        assert datetime.fromisoformat(formatted).strftime('%Y-%m-%dT%H:%M:%S') == formatted, date_str
+        return formatted
+    return datetime.fromisoformat(date_str.replace('Z', '+00:00')).strftime('%Y-%m-%dT%H:%M:%S')
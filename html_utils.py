@@ -7,69 +7,192 @@ including proper handling of HTML entities and text formatting.
 """
 
 import re
-import html
-from bs4 import BeautifulSoup
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+from html import unescape
 
+import lxml.etree
 
+
+# Nodes that carry no readable text; removed from the tree (keeping their tail text)
+_NON_TEXT_NODES = ('script', 'style', 'template', lxml.etree.Comment, lxml.etree.ProcessingInstruction)
+
+# Control characters (0x00-0x1F, 0x7F) plus invisible/problematic Unicode characters
+# (zero-width spaces, joiners, marks, BOM, soft hyphens, etc.), and the codepoints
+# lxml can't represent (lone surrogates, U+FFFE/U+FFFF)
+_BAD_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\u200b-\u200f\u2028\u2029\ufeff\u00ad\ud800-\udfff\ufffe\uffff]')
+
+# The ASCII subset of _BAD_CHARS_RE as a str.translate deletion table
+_BAD_ASCII_CHARS = dict.fromkeys(list(range(0x00, 0x09)) + [0x0B, 0x0C] + list(range(0x0E, 0x20)) + [0x7F])
+
+# lxml serializes concurrent parses on a shared parser, so each thread gets its own
+_parsers = threading.local()
+
+# Block-level tags that start a new line in clean_html_content_with_linebreaks
+_BLOCK_TAGS = frozenset(('p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li'))
+
+
+def _remove_bad_chars(text):
+    """Delete control and invisible characters from text in a single pass."""
+
+    # str.translate is fastest on pure ASCII but falls back to a slow per-character
+    # path for other strings, where the compiled character class wins
+    if text.isascii():
+        return text.translate(_BAD_ASCII_CHARS)
+    return _BAD_CHARS_RE.sub('', text)
+
+
+def _html_parser():
+    """Return this thread's HTML parser.
+
+    huge_tree lifts libxml2's nesting depth limit; without it, markup nested more than
+    255 levels deep (broken or pasted WordPress markup) silently loses everything from
+    the deep node onward. Markup is passed as UTF-8 bytes with a fixed encoding, since
+    lxml rejects str input carrying an XML encoding declaration (e.g. pasted SVG).
+    """
+    parser = getattr(_parsers, 'parser', None)
+    if parser is None:
+        parser = _parsers.parser = lxml.etree.HTMLParser(huge_tree=True, encoding='utf-8')
+    return parser
+
+
+def _parse_html(markup):
+    """Parse HTML markup with lxml into an element tree, without non-text nodes.
+
+    Control and invisible characters are removed first; lxml refuses control characters
+    and other codepoints outside the XML character range (lone surrogates included, so
+    the text always encodes).
+    """
+    root = lxml.etree.HTML(_remove_bad_chars(markup).encode('utf-8'), parser=_html_parser())
+
+    # Markup with no content at all (e.g. empty, or only a doctype or comments)
+    if root is None:
+        return lxml.etree.Element('html')
+
+    lxml.etree.strip_elements(root, *_NON_TEXT_NODES, with_tail=False)
+    return root
+
+
+def _collapse_lines(text):
+    """Clean up text in a single pass over its lines.
+
+    Collapses whitespace within each line and keeps at most one blank line between paragraphs.
+    """
+    lines = []
+    for line in text.split('\n'):
+        line = ' '.join(line.split())
+        if line or (lines and lines[-1]):
+            lines.append(line)
+
+    return '\n'.join(lines).strip()
+
+
+def _digest_lru_cache(maxsize):
+    """LRU cache keyed by a blake2b digest of the input, so large HTML bodies aren't kept as keys."""
+
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(html_content):
+            key = hashlib.blake2b(html_content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+
+            result = func(html_content)
+
+            with lock:
+                cache[key] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=4096)
 def clean_html_content(html_content):
     """Remove HTML tags and clean the content"""
-    
-    # First decode HTML entities (like &#8211; -> –)
-    decoded_content = html.unescape(html_content)
 
-    # Create BS object
-    soup = BeautifulSoup(decoded_content, 'html.parser')
+    # Text without tags (most post titles) skips the parser; html.unescape decodes
+    # entities like lxml does. Invisible characters are removed before decoding
+    # (as before parsing) and again after, since entities may decode to them
+    if '<' not in html_content:
+        return ' '.join(_remove_bad_chars(unescape(_remove_bad_chars(html_content))).split())
 
-    # Get text content
-    text = soup.get_text(separator=' ', strip=True)
+    # Parse with lxml, which also decodes HTML entities (like &#8211; -> –)
+    root = _parse_html(html_content)
 
-    # Remove control characters and problematic Unicode characters first
-    # Control characters (0x00-0x1F, 0x7F)
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    
-    # Remove invisible/problematic Unicode characters that can cause display issues
-    # Zero-width spaces, joiners, marks, BOM, soft hyphens, etc.
-    text = re.sub(r'[\u200b-\u200f\u2028\u2029\ufeff\u00ad]', '', text)
+    # Get text content; entities may decode to invisible characters, so remove those after parsing
+    text = _remove_bad_chars(' '.join(root.itertext()))
 
     # Remove extra whitespace (after removing invisible characters)
-    text = re.sub(r'\s+', ' ', text)
+    return ' '.join(text.split())
+
 
-    return text.strip()
+def clean_html_content_batch(texts):
+    """Clean a batch of HTML strings (e.g. all titles of a page), keeping their order.
 
+    Repeated inputs within and across batches are served by clean_html_content's cache.
+    """
+    return list(map(clean_html_content, texts))
 
+
+@_digest_lru_cache(maxsize=256)
 def clean_html_content_with_linebreaks(html_content):
     """Remove HTML tags and clean the content while preserving line breaks."""
-    
-    # First decode HTML entities (like &#8211; -> –)
-    decoded_content = html.unescape(html_content)
-    
-    # Replace <br> and </p> tags with newline characters before creating BeautifulSoup
-    decoded_content = decoded_content.replace('<br>', '\n').replace('</p>', '\n')
-
-    # Create BeautifulSoup object
-    soup = BeautifulSoup(decoded_content, 'html.parser')
-
-    # Get text content, using '\n' as separator for block elements
-    text = ''
-    for element in soup.descendants:
-        if isinstance(element, str):
-            text += element.strip() + ' '
-        elif element.name in ['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li']:
-            text += '\n'
-
-    # Clean up the text
-    # Remove extra whitespace within lines
-    text = re.sub(r' +', ' ', text)
-
-    # Remove extra blank lines (more than 2 consecutive newlines)
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
 
+    if not html_content:
+        return ''
+
+    # Text without tags skips the parser, like in clean_html_content. Line endings are
+    # normalized to '\n' first, as the parser does for the raw markup
+    if '<' not in html_content:
+        text = _remove_bad_chars(html_content)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return _collapse_lines(_remove_bad_chars(unescape(text)))
+
+    # Parse with lxml, which also decodes HTML entities (like &#8211; -> –)
+    root = _parse_html(html_content)
+
+    # Get text content, with a '\n' at each <br>, after each paragraph and before
+    # block elements (one per block boundary). Each element contributes its own text
+    # on entry and its tail text on exit. Whitespace-only text is skipped: every
+    # kept chunk is already followed by a space
+    parts = []
+    append = parts.append
+    for event, element in lxml.etree.iterwalk(root, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if tag == 'br' or (tag in _BLOCK_TAGS and parts and parts[-1] != '\n'):
+                append('\n')
+            text = element.text
+        else:
+            if tag == 'p':
+                append('\n')
+            text = element.tail
+        if text:
+            text = text.strip()
+            if text:
+                append(text)
+                append(' ')
     # Remove control characters and problematic Unicode characters
-    # Control characters (0x00-0x1F, 0x7F)
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    
-    # Remove invisible/problematic Unicode characters that can cause display issues
-    # Zero-width spaces, joiners, marks, BOM, soft hyphens, etc.
-    text = re.sub(r'[\u200b-\u200f\u2028\u2029\ufeff\u00ad]', '', text)
-
-    return text.strip()
\ No newline at end of file
+    text = _remove_bad_chars(''.join(parts))
+
+    return _collapse_lines(text)
+
+
+def warmup():
+    """Exercise the parser once so preloaded Gunicorn workers fork with it initialized."""
+    _parse_html('<p>x</p>')
@@ -6,62 +6,108 @@ This module provides a REST API interface to the extraction functionality
 with both synchronous and asynchronous endpoints for handling long-running requests.
 """
 
-import requests
-import re
-from bs4 import BeautifulSoup
+import os
+import time
+import zlib
+import orjson
+import itertools
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 from celery_app import celery_app
 from tasks import extract_wordpress_content
-from html_utils import clean_html_content, clean_html_content_with_linebreaks
+from html_utils import clean_html_content_batch, clean_html_content_with_linebreaks, warmup
+from date_utils import format_post_date, parse_after_date
+from wordpress_api import MAX_FETCH_WORKERS, build_request, create_session, fetch_wordpress_posts
 
 
 # Extraction Methods ===================================================================
 
+# Shared by all request threads of a Gunicorn worker to clean posts in parallel;
+# lxml parses without holding the GIL. Threads only start on first use, so
+# preloading the app doesn't fork a process that already runs them
+_CLEAN_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='clean')
 
-def fetch_wordpress_posts(base_url, post_type, per_page=100, page=1, after=None):
-  """Fetch posts with WordPress API
+# Shared HTTP session so page requests reuse pooled keep-alive connections. Every
+# request thread of the worker (GUNICORN_THREADS, see gunicorn.conf.py) can fetch
+# MAX_FETCH_WORKERS pages at once, so the pool is sized for all of them
+_SESSION = create_session(pool_size=int(os.environ.get('GUNICORN_THREADS', 16)) * MAX_FETCH_WORKERS)
+
+
+def iter_all_posts(base_url, post_type, after_date=None):
+  """Yields all posts content from all pages, page by page
+  
+  Pages are fetched concurrently but cleaned and yielded in order, so callers can
+  stream posts while later pages are still downloading.
+  
+  Raises:
+      RuntimeError: If the first page can't be fetched
   
   Args:
       base_url (str): Base URL of the WordPress site
       post_type (str): Type of post to fetch (e.g., 'posts', 'pages')
-      per_page (int, optional): Number of posts per page. Defaults to 100.
-      page (int, optional): Page number to fetch. Defaults to 1.
-      after (str, optional): Fetch posts after this date. Format: YYYY-MM-DDT00:00:00 or ISO 8601 (e.g., 2025-04-26T21:32:52.043Z). Defaults to None.
+      after_date (str, optional): Fetch posts after this date. Format: YYYY-MM-DDT00:00:00 or ISO 8601 (e.g., 2025-04-26T21:32:52.043Z). Defaults to None.
   """
 
-  # Construct the API URL
-  api_url = f"{base_url}/wp-json/wp/v2/{post_type}"
-
-  # Parameters for the request
-  params = {
-    'per_page': per_page,
-    'page': page,
-    'status': 'publish',
-    'orderby': 'date',
-    'order': 'desc',
-  }
-  
-  # Add after parameter if provided
-  if after:
-    params['after'] = after  # Using YYYY-MM-DDT00:00:00 format
+  # URL and query parameters are the same for every page
+  api_url, base_params = build_request(base_url, post_type, after=after_date)
 
-  try:
+  # Fetch the first page synchronously to discover the total number of pages
+  posts, total_pages = fetch_wordpress_posts(_SESSION, api_url, base_params, page=1)
 
-    # Make the request
-    response = requests.get(api_url, params=params)
-    response.raise_for_status() # Raise exception for bad status codes
+  # None means the request failed, unlike an empty list of posts
+  if posts is None:
+    raise RuntimeError("Failed to fetch posts from the WordPress API")
+  if not posts:
+    return
 
-    # Get total pages from headers
-    total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+  fetcher = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS)
 
-    return response.json(), total_pages
+  processed_posts = 0
+  processed_pages = 0
+  clean_futures = []
 
-  except requests.exceptions.RequestException as e:
-    print(f"Error fetching posts: {e}")
-    return None, 0
+  try:
+    # Fetch the remaining pages concurrently; map hands them back in page order
+    remaining_pages = fetcher.map(
+      lambda page: fetch_wordpress_posts(_SESSION, api_url, base_params, page=page)[0],
+      range(2, total_pages + 1)
+    )
+
+    for page_posts in itertools.chain([posts], remaining_pages):
+      if not page_posts:
+        break;
+      processed_pages += 1
+
+      # Titles are short (mostly tag-free) and cleaned as one batch in this thread;
+      # content cleaning is CPU-bound, so each page is spread across the shared pool
+      titles = clean_html_content_batch([post['title']['rendered'] for post in page_posts])
+      clean_futures = [
+        _CLEAN_POOL.submit(clean_html_content_with_linebreaks, post['content']['rendered'])
+        for post in page_posts
+      ]
+
+      for post, title, content in zip(page_posts, titles, clean_futures):
+        processed_posts += 1
+        yield {
+          'id': post['id'],
+          'date': format_post_date(post['date']),
+          'title': title,
+          'content': content.result()
+        }
+
+    print(f"Processed {processed_posts} posts from {processed_pages} of {total_pages} pages")
+
+  finally:
+    # Also reached when the consumer stops early (e.g. the client disconnected)
+    fetcher.shutdown(wait=False, cancel_futures=True)
+    # The clean pool is shared, so only this page's pending posts are cancelled
+    for future in clean_futures:
+      future.cancel()
 
 
 def extract_all_posts(base_url, post_type, after_date=None):
@@ -73,53 +119,150 @@ def extract_all_posts(base_url, post_type, after_date=None):
       after_date (str, optional): Fetch posts after this date. Format: YYYY-MM-DDT00:00:00 or ISO 8601 (e.g., 2025-04-26T21:32:52.043Z). Defaults to None.
   """
 
-  all_posts_content = []
-  page = 1
-
-  while True:
-    posts, total_pages = fetch_wordpress_posts(base_url, post_type, page=page, after=after_date)
+  return list(iter_all_posts(base_url, post_type, after_date=after_date))
 
-    if not posts:
-      break;
+# =======================================================================================
 
-    for post in posts:
-      post_data = {
-        'id': post['id'],
-        'date': datetime.fromisoformat(post['date'].replace('Z', '+00:00')).strftime('%Y-%m-%dT%H:%M:%S'),
-        'title': clean_html_content(post['title']['rendered']),
-        'content': clean_html_content_with_linebreaks(post['content']['rendered'])
-      }
-      all_posts_content.append(post_data)
 
-    print(f"Processed page {page} of {total_pages}")
+# API ===================================================================================
 
-    if page >= total_pages:
-      break;
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which serializes large post lists much faster.
 
-    page += 1
+    Also used by request.get_json(), so request bodies are parsed with orjson too.
+    Types orjson can't handle natively fall back to DefaultJSONProvider.default.
+    """
 
-  return all_posts_content
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
 
-# =======================================================================================
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 
-# API ===================================================================================
+# Initialize HTML parsers before workers fork (preload_app shares them copy-on-write)
+warmup()
 
 # Initialize Flask application
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configure Cross-Origin Resource Sharing
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+# Compress responses (post content is very compressible text). Flask-Compress buffers
+# streamed responses, so /extract compresses its own stream instead (see _gzip_stream)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+
+# Error returned by both extraction endpoints for an unparseable 'afterDate'
+AFTER_DATE_ERROR = "Invalid date format for 'afterDate'. Expected format: YYYY-MM-DD, YYYY-MM-DDT00:00:00, or ISO 8601 format like 2025-04-26T21:32:52.043Z"
+
+def _constant_error(message, with_data=True):
+    """Serialize a fixed validation error body once, at import time."""
+    if with_data:
+        return orjson.dumps({"success": False, "data": None, "error": message})
+    return orjson.dumps({"success": False, "error": message})
+
+
+# Prebuilt validation error bodies for /extract ...
+_ERR_EMPTY = _constant_error("Request is Empty")
+_ERR_MISSING_POST_TYPE = _constant_error("Missing 'postType' parameter")
+_ERR_MISSING_BASE_URL = _constant_error("Missing 'baseUrl' parameter")
+_ERR_AFTER_DATE = _constant_error(AFTER_DATE_ERROR)
+
+# ... and for /extract/async, whose error bodies have no "data" field
+_ASYNC_ERR_EMPTY = _constant_error("Request is Empty", with_data=False)
+_ASYNC_ERR_MISSING_POST_TYPE = _constant_error("Missing 'postType' parameter", with_data=False)
+_ASYNC_ERR_MISSING_BASE_URL = _constant_error("Missing 'baseUrl' parameter", with_data=False)
+_ASYNC_ERR_AFTER_DATE = _constant_error(AFTER_DATE_ERROR, with_data=False)
+
+
+def _error_response(body, status=400):
+    """Wrap a prebuilt error body in a Response.
+
+    A new Response is created per request because after_request hooks
+    (CORS) add headers to it.
+    """
+    return Response(body, status=status, mimetype='application/json')
+
+
+# Serialized health check body and the monotonic time until which it is reused
+HEALTH_CACHE_SECONDS = 1.0
+_health_cache = (0.0, b'')
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for monitoring and load balancers."""
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "service": "WordPress Extractor API"
-    }), 200
+    global _health_cache
+
+    # Load balancers ping often; the body is rebuilt at most once per HEALTH_CACHE_SECONDS.
+    # Request threads race on _health_cache without a lock on purpose: the tuple is read
+    # and replaced atomically, so the worst case is a duplicate rebuild
+    now = time.monotonic()
+    expiry, body = _health_cache
+    if now >= expiry:
+        body = orjson.dumps({
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat(),
+            "service": "WordPress Extractor API"
+        })
+        _health_cache = (now + HEALTH_CACHE_SECONDS, body)
+
+    return Response(body, status=200, mimetype='application/json')
+
+
+# Streamed responses are flushed to the client in chunks of about this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _json_stream(posts):
+    """Serialize posts as the /extract JSON body, yielding it in chunks.
+
+    Produces the same {"data", "error", "success"} object as a jsonify'd list.
+    A failure after the response has started can't change the status code, so
+    "success" is written last: the trailer carries the error and success false,
+    and clients never see success true on truncated data.
+    """
+    buffer = [b'{"data":[']
+    size = 0
+    error = None
+
+    try:
+        for index, post in enumerate(posts):
+            chunk = orjson.dumps(post)
+            buffer.append(b',' + chunk if index else chunk)
+            size += len(chunk)
+            if size >= STREAM_CHUNK_SIZE:
+                yield b''.join(buffer)
+                buffer = []
+                size = 0
+    except Exception as e:
+        app.logger.exception("Error while streaming posts")
+        error = str(e)
+
+    success = b'true' if error is None else b'false'
+    buffer.append(b'],"error":' + orjson.dumps(error) + b',"success":' + success + b'}')
+    yield b''.join(buffer)
+
+
+def _gzip_stream(chunks):
+    """Gzip a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(app.config.get('COMPRESS_LEVEL', 6), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
 
 
 @app.route('/extract', methods=['POST'])
@@ -149,91 +292,42 @@ def extract():
         # Validate request data
         
         if not request_data:
-            return jsonify({
-                "success": False,
-                "data": None,
-                "error": "Request is Empty"
-            })
+            return _error_response(_ERR_EMPTY)
         
         if 'postType' not in request_data:
-            return jsonify({
-                "success": False,
-                "data": None,
-                "error": "Missing 'postType' parameter"
-            }), 400
+            return _error_response(_ERR_MISSING_POST_TYPE)
             
         if 'baseUrl' not in request_data:
-            return jsonify({
-                "success": False,
-                "data": None,
-                "error": "Missing 'baseUrl' parameter"
-            }), 400
+            return _error_response(_ERR_MISSING_BASE_URL)
         
         post_type = request_data['postType']
         base_url = request_data['baseUrl']
         after_date = None
         
         # Check if afterDate parameter is provided and not empty/null
-        if 'afterDate' in request_data and request_data['afterDate'] and request_data['afterDate'].strip():
+        after_date_str = (request_data.get('afterDate') or '').strip()
+        if after_date_str:
             try:
                 # Parse the date to ensure it's valid
-                after_date_str = request_data['afterDate'].strip()
-                
-                try:
-                    # Handle various date formats
-                    if 'T' in after_date_str:
-                        # Handle ISO 8601 format with Z (UTC) timezone indicator and possibly milliseconds
-                        if 'Z' in after_date_str:
-                            # Remove the Z and convert to datetime
-                            clean_date_str = after_date_str.replace('Z', '+00:00')
-                            if '.' in clean_date_str:
-                                # Format with milliseconds: 2025-04-26T21:32:52.043+00:00
-                                date_obj = datetime.fromisoformat(clean_date_str)
-                            else:
-                                # Format without milliseconds: 2025-04-26T21:32:52+00:00
-                                date_obj = datetime.fromisoformat(clean_date_str)
-                        else:
-                            try:
-                                # Try standard format with seconds
-                                date_obj = datetime.strptime(after_date_str, '%Y-%m-%dT%H:%M:%S')
-                            except ValueError:
-                                try:
-                                    # Try without seconds
-                                    date_obj = datetime.strptime(after_date_str, '%Y-%m-%dT%H:%M')
-                                except ValueError:
-                                    # Last attempt - try with milliseconds
-                                    if '.' in after_date_str:
-                                        date_parts = after_date_str.split('.')
-                                        base_date = datetime.strptime(date_parts[0], '%Y-%m-%dT%H:%M:%S')
-                                        date_obj = base_date
-                                    else:
-                                        # If all fails, raise to be caught by outer try-except
-                                        raise ValueError("Invalid date format")
-                    else:
-                        # If only date is provided, add the time part
-                        date_obj = datetime.strptime(after_date_str, '%Y-%m-%d')
-                    
-                    # Always format in YYYY-MM-DDT00:00:00 format for WordPress API
-                    after_date = date_obj.strftime('%Y-%m-%dT00:00:00')
-                except ValueError:
-                    # If parsing fails, raise exception to be caught by outer try-except
-                    raise ValueError("Invalid date format")
+                after_date = parse_after_date(after_date_str)
             except ValueError:
-                return jsonify({
-                    "success": False,
-                    "data": None,
-                    "error": "Invalid date format for 'afterDate'. Expected format: YYYY-MM-DD, YYYY-MM-DDT00:00:00, or ISO 8601 format like 2025-04-26T21:32:52.043Z"
-                }), 400
+                return _error_response(_ERR_AFTER_DATE)
         
-        # Extract posts
-        posts = extract_all_posts(base_url=base_url, post_type=post_type, after_date=after_date)
+        # Extract posts. The first post is pulled here so a failed first page
+        # (RuntimeError) still produces a 500 response instead of a broken stream
+        posts = iter_all_posts(base_url=base_url, post_type=post_type, after_date=after_date)
+        first_post = next(posts, None)
+        if first_post is not None:
+            posts = itertools.chain([first_post], posts)
         
-        # Return successful response
-        return jsonify({
-            "success": True,
-            "data": posts,
-            "error": None
-        })
+        # Return successful response, streamed (and gzipped if accepted) as posts are cleaned
+        body = _json_stream(posts)
+        headers = {'Vary': 'Accept-Encoding'}
+        if request.accept_encodings['gzip']:
+            body = _gzip_stream(body)
+            headers['Content-Encoding'] = 'gzip'
+        
+        return Response(stream_with_context(body), mimetype='application/json', headers=headers)
         
     except Exception as e:
         # Handle unexpected errors
@@ -268,57 +362,25 @@ def extract_async():
         
         # Validate request data
         if not request_data:
-            return jsonify({
-                "success": False,
-                "error": "Request is Empty"
-            }), 400
+            return _error_response(_ASYNC_ERR_EMPTY)
         
         if 'postType' not in request_data:
-            return jsonify({
-                "success": False,
-                "error": "Missing 'postType' parameter"
-            }), 400
+            return _error_response(_ASYNC_ERR_MISSING_POST_TYPE)
             
         if 'baseUrl' not in request_data:
-            return jsonify({
-                "success": False,
-                "error": "Missing 'baseUrl' parameter"
-            }), 400
+            return _error_response(_ASYNC_ERR_MISSING_BASE_URL)
         
         post_type = request_data['postType']
         base_url = request_data['baseUrl']
         after_date = None
         
         # Handle afterDate parameter (same logic as sync endpoint)
-        if 'afterDate' in request_data and request_data['afterDate'] and request_data['afterDate'].strip():
+        after_date_str = (request_data.get('afterDate') or '').strip()
+        if after_date_str:
             try:
-                after_date_str = request_data['afterDate'].strip()
-                
-                if 'T' in after_date_str:
-                    if 'Z' in after_date_str:
-                        clean_date_str = after_date_str.replace('Z', '+00:00')
-                        date_obj = datetime.fromisoformat(clean_date_str)
-                    else:
-                        try:
-                            date_obj = datetime.strptime(after_date_str, '%Y-%m-%dT%H:%M:%S')
-                        except ValueError:
-                            try:
-                                date_obj = datetime.strptime(after_date_str, '%Y-%m-%dT%H:%M')
-                            except ValueError:
-                                if '.' in after_date_str:
-                                    date_parts = after_date_str.split('.')
-                                    date_obj = datetime.strptime(date_parts[0], '%Y-%m-%dT%H:%M:%S')
-                                else:
-                                    raise ValueError("Invalid date format")
-                else:
-                    date_obj = datetime.strptime(after_date_str, '%Y-%m-%d')
-                
-                after_date = date_obj.strftime('%Y-%m-%dT00:00:00')
+                after_date = parse_after_date(after_date_str)
             except ValueError:
-                return jsonify({
-                    "success": False,
-                    "error": "Invalid date format for 'afterDate'. Expected format: YYYY-MM-DD, YYYY-MM-DDT00:00:00, or ISO 8601 format like 2025-04-26T21:32:52.043Z"
-                }), 400
+                return _error_response(_ASYNC_ERR_AFTER_DATE)
         
         # Start async task
         task = extract_wordpress_content.delay(base_url, post_type, after_date)
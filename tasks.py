@@ -4,46 +4,35 @@ Celery tasks for WordPress content extraction.
 Handles long-running extraction operations asynchronously.
 """
 
-import requests
-import re
-from bs4 import BeautifulSoup
-from datetime import datetime
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from celery import current_task
 from celery_app import celery_app
 from html_utils import clean_html_content, clean_html_content_with_linebreaks
+from date_utils import format_post_date
+from wordpress_api import MAX_FETCH_WORKERS, build_request, create_session, fetch_wordpress_posts
 
 
-def fetch_wordpress_posts(base_url, post_type, per_page=100, page=1, after=None):
-    """Fetch posts with WordPress API"""
-    # Construct the API URL
-    api_url = f"{base_url}/wp-json/wp/v2/{post_type}"
-    
-    # Parameters for the request
-    params = {
-        'per_page': per_page,
-        'page': page,
-        'status': 'publish',
-        'orderby': 'date',
-        'order': 'desc',
-    }
-    
-    # Add after parameter if provided
-    if after:
-        params['after'] = after
-    
+# Minimum number of seconds between throttled progress updates sent to the broker
+PROGRESS_UPDATE_INTERVAL = 0.5
+
+
+def _process_post(post):
+    """Extract a single post's fields, or return None if the post can't be processed."""
     try:
-        # Make the request
-        response = requests.get(api_url, params=params, timeout=30)
-        response.raise_for_status()
-        
-        # Get total pages from headers
-        total_pages = int(response.headers.get('X-WP-TotalPages', 1))
-        
-        return response.json(), total_pages
+        return {
+            'id': post['id'],
+            'date': format_post_date(post['date']),
+            'title': clean_html_content(post['title']['rendered']),
+            'content': clean_html_content_with_linebreaks(
+                post['content']['rendered']
+            )
+        }
     
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching posts: {e}")
-        return None, 0
+    except Exception as post_error:
+        print(f"Error processing post {post.get('id', 'unknown')}: {post_error}")
+        return None
 
 
 @celery_app.task(bind=True, name='tasks.extract_wordpress_content')
@@ -61,75 +50,86 @@ def extract_wordpress_content(self, base_url, post_type, after_date=None):
     """
     try:
         all_posts_content = []
-        page = 1
-        total_pages = 1
         processed_posts = 0
         
+        # Progress meta is built once and updated in place. Each update_state is a
+        # broker round-trip, so updates are rate limited unless forced
+        meta = {
+            'current_page': 0,
+            'total_pages': 'unknown',
+            'processed_posts': 0,
+            'status': 'Starting extraction...'
+        }
+        last_update = [0.0]
+        
+        def report_progress(force=False, **changes):
+            meta.update(changes)
+            now = time.monotonic()
+            if force or now - last_update[0] > PROGRESS_UPDATE_INTERVAL:
+                last_update[0] = now
+                self.update_state(state='PROGRESS', meta=meta)
+        
         # Update task state
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current_page': 0,
-                'total_pages': 'unknown',
-                'processed_posts': 0,
-                'status': 'Starting extraction...'
-            }
-        )
+        report_progress(force=True)
         
-        while page <= total_pages:
-            # Update progress
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    'current_page': page,
-                    'total_pages': total_pages,
-                    'processed_posts': processed_posts,
-                    'status': f'Processing page {page} of {total_pages}...'
-                }
-            )
+        # Keep-alive session shared by all page requests of this task
+        with create_session() as session:
             
-            posts, total_pages = fetch_wordpress_posts(
-                base_url, post_type, page=page, after=after_date
-            )
+            # URL and query parameters are the same for every page of this task
+            api_url, base_params = build_request(base_url, post_type, after=after_date)
             
-            if not posts:
-                break
+            # Fetch the first page synchronously to discover the total number of pages
+            posts, total_pages = fetch_wordpress_posts(session, api_url, base_params, page=1)
+            pages = {1: posts} if posts else {}
             
-            for post in posts:
-                try:
-                    post_data = {
-                        'id': post['id'],
-                        'date': datetime.fromisoformat(
-                            post['date'].replace('Z', '+00:00')
-                        ).strftime('%Y-%m-%dT%H:%M:%S'),
-                        'title': clean_html_content(post['title']['rendered']),
-                        'content': clean_html_content_with_linebreaks(
-                            post['content']['rendered']
-                        )
+            # Fetch the remaining pages concurrently, reporting progress as they complete
+            if posts and total_pages > 1:
+                with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+                    futures = {
+                        executor.submit(fetch_wordpress_posts, session, api_url, base_params, page=page): page
+                        for page in range(2, total_pages + 1)
                     }
+                    
+                    for completed, future in enumerate(as_completed(futures), start=2):
+                        page_posts, _ = future.result()
+                        if page_posts:
+                            pages[futures[future]] = page_posts
+                        
+                        report_progress(
+                            current_page=completed,
+                            total_pages=total_pages,
+                            status=f'Fetched {completed} of {total_pages} pages...'
+                        )
+        
+        # Process pages in order, stopping at the first page that came back empty.
+        # Posts of a page are cleaned in parallel; lxml parses without holding the GIL
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for page in range(1, total_pages + 1):
+                if page not in pages:
+                    break
+                
+                # Always report page boundaries
+                report_progress(
+                    force=True,
+                    current_page=page,
+                    total_pages=total_pages,
+                    processed_posts=processed_posts,
+                    status=f'Processing page {page} of {total_pages}...'
+                )
+                
+                for post_data in executor.map(_process_post, pages[page]):
+                    if post_data is None:
+                        continue
+                    
                     all_posts_content.append(post_data)
                     processed_posts += 1
                     
-                    # Update progress every 10 posts
+                    # Update progress every 10 posts, rate limited
                     if processed_posts % 10 == 0:
-                        self.update_state(
-                            state='PROGRESS',
-                            meta={
-                                'current_page': page,
-                                'total_pages': total_pages,
-                                'processed_posts': processed_posts,
-                                'status': f'Processed {processed_posts} posts...'
-                            }
+                        report_progress(
+                            processed_posts=processed_posts,
+                            status=f'Processed {processed_posts} posts...'
                         )
-                
-                except Exception as post_error:
-                    print(f"Error processing post {post.get('id', 'unknown')}: {post_error}")
-                    continue
-            
-            if page >= total_pages:
-                break
-            
-            page += 1
         
         # Final success state
         return {
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test suite for the date_utils module ('afterDate' parsing and post date formatting).
+"""
+
+import unittest
+from date_utils import format_post_date, parse_after_date
+
+
+# (afterDate input, expected WordPress API value) pairs for parse_after_date
+AFTER_DATE_CASES = (
+    ("2025-04-26", "2025-04-26T00:00:00"),
+    ("2025-4-6", "2025-04-06T00:00:00"),
+    ("2025-04-26T21:32", "2025-04-26T00:00:00"),
+    ("2025-04-26 21:32:52", "2025-04-26T00:00:00"),
+    ("2025-04-26T9:00:00", "2025-04-26T00:00:00"),
+    ("2025-04-26T21:32:52.043Z", "2025-04-26T00:00:00"),
+    ("2025-04-26T21:32:52+03:00", "2025-04-26T00:00:00"),
+    ("2025-04-26T21:32:52-0300", "2025-04-26T00:00:00"),
+)
+
+# afterDate values parse_after_date must reject
+INVALID_AFTER_DATES = (
+    "",
+    "26/04/2025",
+    "2025-04-26T",
+    "2025-04-26T24:00:00",
+    "2025-04-26T21:60",
+    "2025-02-30",
+    "2025-13-01",
+    # Arabic-Indic digits, which \d would accept
+    "٢٠٢٥-٠٤-٢٦",
+    "2025-04-26T٢١:32:52",
+)
+
+
+class TestDateUtils(unittest.TestCase):
+    """Test cases for date_utils"""
+
+    def test_parse_after_date(self):
+        """Test that accepted afterDate formats are normalized to the date at midnight"""
+        for after_date, expected in AFTER_DATE_CASES:
+            with self.subTest(after_date=after_date):
+                self.assertEqual(parse_after_date(after_date), expected)
+
+    def test_parse_after_date_invalid(self):
+        """Test that malformed or impossible afterDate values raise ValueError"""
+        for after_date in INVALID_AFTER_DATES:
+            with self.subTest(after_date=after_date):
+                with self.assertRaises(ValueError):
+                    parse_after_date(after_date)
+
+    def test_format_post_date(self):
+        """Test that WordPress post dates are cut to YYYY-MM-DDTHH:MM:SS"""
+        self.assertEqual(format_post_date("2025-04-26T21:32:52"), "2025-04-26T21:32:52")
+        self.assertEqual(format_post_date("2025-04-26T21:32:52.043Z"), "2025-04-26T21:32:52")
+
+    def test_format_post_date_fallback(self):
+        """Test that dates not in the WordPress shape are parsed and reformatted"""
+        self.assertEqual(format_post_date("2025-04-26 21:32:52Z"), "2025-04-26T21:32:52")
+        self.assertEqual(format_post_date("2025-04-26"), "2025-04-26T00:00:00")
+
+
+if __name__ == '__main__':
+    # Run the tests
+    unittest.main(verbosity=2)
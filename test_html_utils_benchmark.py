@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the html_utils cleaning functions.
+
+Requires pytest-benchmark and only runs when RUN_BENCHMARKS is set, so the default
+pytest run stays fast:
+
+    RUN_BENCHMARKS=1 pytest test_html_utils_benchmark.py --benchmark-min-rounds=100
+
+Setting BENCHMARK_MAX_MEAN_SECONDS additionally fails a benchmark whose mean time
+per call exceeds it (off by default, since wall-clock limits are flaky on shared CI).
+
+The functions are memoized, so the undecorated versions (__wrapped__) are
+benchmarked to measure the actual cleaning work.
+"""
+
+import os
+
+import pytest
+
+if not os.environ.get("RUN_BENCHMARKS"):
+    pytest.skip("benchmarks only run with RUN_BENCHMARKS=1", allow_module_level=True)
+
+pytest.importorskip("pytest_benchmark")
+
+from html_utils import clean_html_content, clean_html_content_with_linebreaks
+
+
+# About 100 KB of typical WordPress post HTML
+_WP_POST_BLOCK = (
+    "<p>Este artigo trata sobre crimes digitais &#8211; especificamente:</p>\n"
+    "<ul>\n"
+    "    <li>Posse de material &#8211; Art. 241-B</li>\n"
+    "    <li>Armazenamento &#38; distribuição</li>\n"
+    "</ul>\n"
+    "<p>A Lei Antifeminicídio (Lei n. 14.994/2024) e os <strong>efeitos</strong> da condenação"
+    "<br>no <a href=\"https://www.exemplo.com\">Direito Penal Militar</a>&#8203;.</p>\n"
+    "<h2>Mais informações</h2>\n"
+    "<div><p>Consulte www.exemplo.com&nbsp;&#8212; atualizado.</p></div>\n"
+)
+WP_SAMPLE_100KB = _WP_POST_BLOCK * (100 * 1024 // len(_WP_POST_BLOCK))
+
+# Optional mean time per call that counts as a regression (unset: no time check)
+MAX_MEAN_SECONDS = float(os.environ.get("BENCHMARK_MAX_MEAN_SECONDS", 0))
+
+
+def _check_mean(benchmark):
+    if MAX_MEAN_SECONDS:
+        assert benchmark.stats.stats.mean < MAX_MEAN_SECONDS
+
+
+def test_bench_clean_html_content(benchmark):
+    result = benchmark(clean_html_content.__wrapped__, WP_SAMPLE_100KB)
+
+    assert "Art. 241-B" in result
+    _check_mean(benchmark)
+
+
+def test_bench_clean_html_content_with_linebreaks(benchmark):
+    result = benchmark(clean_html_content_with_linebreaks.__wrapped__, WP_SAMPLE_100KB)
+
+    assert "Direito Penal Militar" in result
+    _check_mean(benchmark)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+WordPress REST API client helpers for WordPress content extraction.
+
+This module provides the request building and page fetching shared by the
+API endpoints and the Celery tasks.
+"""
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Maximum number of pages fetched concurrently from the WordPress API
+MAX_FETCH_WORKERS = 8
+
+# Post fields requested from the WordPress API (_fields), everything else is dropped server side
+POST_FIELDS = 'id,date,title,content'
+
+
+def create_session(pool_size=MAX_FETCH_WORKERS):
+    """Create an HTTP session whose keep-alive connection pool fits concurrent page fetches"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def build_request(base_url, post_type, per_page=100, after=None):
+    """Build the WordPress API URL and the query parameters shared by every page
+
+    Args:
+        base_url (str): Base URL of the WordPress site
+        post_type (str): Type of post to fetch (e.g., 'posts', 'pages')
+        per_page (int, optional): Number of posts per page. Defaults to 100.
+        after (str, optional): Fetch posts after this date. Format: YYYY-MM-DDT00:00:00. Defaults to None.
+    """
+    # Construct the API URL
+    api_url = f"{base_url}/wp-json/wp/v2/{post_type}"
+
+    # Parameters for the request
+    base_params = {
+        'per_page': per_page,
+        'status': 'publish',
+        'orderby': 'date',
+        'order': 'desc',
+        # Only the fields the extraction uses; skips _links, meta, excerpt, etc.
+        '_fields': POST_FIELDS,
+    }
+
+    # Add after parameter if provided
+    if after:
+        base_params['after'] = after
+
+    return api_url, base_params
+
+
+def fetch_wordpress_posts(session, api_url, base_params, page=1):
+    """Fetch one page of posts with WordPress API
+
+    Returns:
+        tuple: (posts, total_pages), or (None, 0) if the request or decoding failed
+    """
+    params = {**base_params, 'page': page}
+
+    try:
+        # Make the request
+        response = session.get(api_url, params=params, timeout=30)
+        response.raise_for_status()  # Raise exception for bad status codes
+
+        # Get total pages from headers
+        total_pages = int(response.headers.get('X-WP-TotalPages', 1))
+
+        # Decode the already-decompressed body with orjson (much faster than stdlib json on large pages)
+        return orjson.loads(response.content), total_pages
+
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        print(f"Error fetching posts: {e}")
+        return None, 0